@@ -1,16 +1,28 @@
 import os
 import time
+import asyncio
 import datetime
+import functools
+import itertools
 import json
 import logging
 import argparse
 import re
-import pytz
+from pathlib import Path
+from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
-from slack_sdk import WebClient
+from slack_sdk.web.async_client import AsyncWebClient
+from slack_sdk.web.async_slack_response import AsyncSlackResponse
 from slack_sdk.errors import SlackApiError
 from pydantic import BaseModel, Field
-from typing import TypedDict
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable
+from typing import IO, Any, TypedDict
+
+# orjsonがインストールされている場合はJSONの書き出しに使用する（任意の依存関係）
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # ロギングの設定
 logging.basicConfig(
@@ -30,7 +42,40 @@ if not SLACK_TOKEN:
     raise ValueError("SLACK_TOKEN must be set in .env file")
 
 # 日本のタイムゾーンを設定
-JST = pytz.timezone("Asia/Tokyo")
+# 日付の解釈や現在時刻など、一般的な日本時間の扱いには JST を使用する
+JST = ZoneInfo("Asia/Tokyo")
+# メッセージ時刻（readable_time）の整形専用の固定オフセット（UTC+9）。
+# メッセージごとに呼ばれるため、タイムゾーンデータベースの参照が不要な固定オフセットを使う。
+# 日本は1951年以降夏時間がないため、Slackのメッセージ時刻では JST と同じ結果になる。
+JST_FIXED_OFFSET = datetime.timezone(datetime.timedelta(hours=9), "JST")
+
+# Slack APIへの同時リクエスト数の上限（--concurrency の既定値）
+MAX_CONCURRENT_REQUESTS = 8
+
+# Slack APIメソッドごとの1分あたりのリクエスト上限
+# https://api.slack.com/apis/rate-limits
+API_RATE_LIMITS_PER_MINUTE = {
+    "conversations.history": 50,  # Tier 3
+    "conversations.replies": 50,  # Tier 3
+    "users.info": 100,  # Tier 4
+    "users.list": 20,  # Tier 2
+}
+# 上記に含まれないメソッドは最も厳しい Tier 2 として扱う
+DEFAULT_RATE_LIMIT_PER_MINUTE = 20
+
+# ユーザー情報キャッシュの保存先と有効期限
+USER_CACHE_PATH = Path.home() / ".cache" / "slack-exporter" / "users.json"
+USER_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# 取得するユーザー数がこれを超える場合は users.list でワークスペース全体を一括取得する
+# （--users-list-threshold の既定値、0 の場合は users.list を使用しない）
+USERS_LIST_THRESHOLD = 20
+
+# 出力ファイルの書き込みバッファサイズ（大きな出力でのwrite呼び出し回数を減らす）
+OUTPUT_BUFFER_SIZE = 2 * 1024 * 1024
+
+# Slackチャンネル URL のパターン
+_CHANNEL_URL_RE = re.compile(r"https://[^/]+/archives/([A-Z0-9]+)")
 
 # Slack APIから返されるメッセージの型定義
 class SlackRawMessage(TypedDict, total=False):
@@ -38,6 +83,7 @@ class SlackRawMessage(TypedDict, total=False):
     user: str
     text: str
     thread_ts: str
+    reply_count: int
 
 def extract_channel_id(channel_input: str) -> str:
     """
@@ -50,10 +96,11 @@ def extract_channel_id(channel_input: str) -> str:
     Returns:
         str: 抽出されたチャンネルID
     """
-    # Slackチャンネル URL のパターン
-    url_pattern = r"https://[^/]+/archives/([A-Z0-9]+)"
-    match = re.match(url_pattern, channel_input)
+    # URLでなければ正規表現を使わずにそのまま返す
+    if not channel_input.startswith("https://"):
+        return channel_input
 
+    match = _CHANNEL_URL_RE.match(channel_input)
     if match:
         channel_id = match.group(1)
         logger.info(
@@ -91,9 +138,35 @@ def parse_args() -> argparse.Namespace:
         "-o",
         help="出力ファイル名 (省略時は 'チャンネルID-YYYYMMDD-HHMMSS.json')",
     )
+    parser.add_argument(
+        "--user-cache",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help=f"ユーザー情報をキャッシュする ({USER_CACHE_PATH} に7日間保存、既定: 有効)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=MAX_CONCURRENT_REQUESTS,
+        help=f"Slack APIへの同時リクエスト数の上限 (既定: {MAX_CONCURRENT_REQUESTS})",
+    )
+    parser.add_argument(
+        "--users-list-threshold",
+        type=int,
+        default=USERS_LIST_THRESHOLD,
+        help=(
+            "取得するユーザー数がこの値を超える場合に users.list でワークスペース全体を"
+            f"一括取得する (0 で無効、既定: {USERS_LIST_THRESHOLD})"
+        ),
+    )
 
     args = parser.parse_args()
 
+    if args.concurrency < 1:
+        parser.error("同時リクエスト数は1以上を指定してください")
+    if args.users_list_threshold < 0:
+        parser.error("users.list を使用する人数のしきい値は0以上を指定してください")
+
     # チャンネルIDの抽出
     args.channel_id = extract_channel_id(args.channel_id)
 
@@ -119,25 +192,25 @@ def parse_args() -> argparse.Namespace:
     return args
 
 
-class ThreadReply(BaseModel):
-    """スレッドの返信を表すPydanticモデル"""
+# 出力するメッセージの型定義
+# 件数が多くバリデーションのコストが大きいため、Pydanticモデルではなく辞書として扱う
+class ThreadReply(TypedDict):
+    """スレッドの返信を表す辞書"""
 
-    timestamp: str = Field(description="Slackのタイムスタンプ")
-    readable_time: str = Field(description="人間が読める形式の時刻")
-    user: str = Field(description="ユーザーID")
-    text: str = Field(description="メッセージ本文")
+    timestamp: str  # Slackのタイムスタンプ
+    readable_time: str  # 人間が読める形式の時刻
+    user: str  # ユーザーID
+    text: str  # メッセージ本文
 
 
-class SlackMessage(BaseModel):
-    """Slackのメッセージを表すPydanticモデル"""
+class SlackMessage(TypedDict):
+    """Slackのメッセージを表す辞書"""
 
-    timestamp: str = Field(description="Slackのタイムスタンプ")
-    readable_time: str = Field(description="人間が読める形式の時刻")
-    user: str = Field(description="ユーザーID")
-    text: str = Field(description="メッセージ本文")
-    thread_replies: list[ThreadReply] = Field(
-        default_factory=list, description="スレッドの返信一覧"
-    )
+    timestamp: str  # Slackのタイムスタンプ
+    readable_time: str  # 人間が読める形式の時刻
+    user: str  # ユーザーID
+    text: str  # メッセージ本文
+    thread_replies: list[ThreadReply]  # スレッドの返信一覧
 
 
 # ユーザー情報を表すPydanticモデル
@@ -148,15 +221,13 @@ class UserInfo(BaseModel):
     display_name: str = Field(description="ユーザーの氏名（実名）")
 
 
-class SlackExport(BaseModel):
-    """Slackエクスポートデータを表すPydanticモデル"""
+class SlackExport(TypedDict):
+    """Slackエクスポートデータを表す辞書（write_export_json が書き込む形式）"""
 
-    start_date: str = Field(description="エクスポート開始日時（JST）")
-    end_date: str = Field(description="エクスポート終了日時（JST）")
-    users: dict[str, UserInfo] = Field(
-        description="ユーザーIDとユーザー情報のマッピング"
-    )
-    chat: list[SlackMessage] = Field(description="チャットメッセージ一覧")
+    start_date: str  # エクスポート開始日時（JST）
+    end_date: str  # エクスポート終了日時（JST）
+    users: dict[str, dict[str, str]]  # ユーザーIDとユーザー情報のマッピング
+    chat: list[SlackMessage]  # チャットメッセージ一覧
 
 
 def convert_datetime_to_timestamp(date_str: str, time_str: str = "00:00:00") -> float | None:
@@ -170,77 +241,189 @@ def convert_datetime_to_timestamp(date_str: str, time_str: str = "00:00:00") ->
         dt_naive = datetime.datetime.strptime(
             f"{date_str} {time_str}", "%Y-%m-%d %H:%M:%S"
         )
-        dt_jst = JST.localize(dt_naive)
+        dt_jst = dt_naive.replace(tzinfo=JST)
         return dt_jst.timestamp()
     except ValueError as e:
         logger.error(f"Date/time format error: {e}")
         return None
 
 
-def fetch_messages_for_period(client: WebClient, channel_id: str, oldest_ts: float, latest_ts: float) -> list[SlackRawMessage]:
+class RateLimiter:
     """
-    指定されたチャンネルから指定期間のメッセージを取得します。
+    Slack APIメソッドごとのトークンバケット方式のレートリミッター。
+    バケットが空の場合のみ、トークンが補充されるまで待機します。
+    また、すべてのメソッドで共有するセマフォで同時リクエスト数を制限します。
     """
-    all_messages = []
-    cursor = None
-    message_count = 0
 
-    logger.info(f"Starting to fetch messages from channel '{channel_id}'...")
-    logger.info(
-        f"Period: {datetime.datetime.fromtimestamp(float(oldest_ts), JST)} to {datetime.datetime.fromtimestamp(float(latest_ts), JST)} (JST)"
-    )
+    def __init__(
+        self,
+        limits_per_minute: dict[str, int] | None = None,
+        max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+    ) -> None:
+        self.limits_per_minute = (
+            API_RATE_LIMITS_PER_MINUTE if limits_per_minute is None else limits_per_minute
+        )
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.tokens: dict[str, float] = {}
+        self.last_refill: dict[str, float] = {}
+
+    def refill_rate(self, method: str) -> float:
+        """1秒あたりに補充されるトークン数を返します。"""
+        return self.limits_per_minute.get(method, DEFAULT_RATE_LIMIT_PER_MINUTE) / 60
+
+    def capacity(self, method: str) -> float:
+        """バケットの容量（1分あたりのリクエスト上限）を返します。"""
+        return self.limits_per_minute.get(method, DEFAULT_RATE_LIMIT_PER_MINUTE)
+
+    def refill(self, method: str) -> None:
+        """経過時間に応じてトークンを補充します。"""
+        now = time.monotonic()
+        if method not in self.tokens:
+            self.tokens[method] = self.capacity(method)
+        else:
+            elapsed = now - self.last_refill[method]
+            self.tokens[method] = min(
+                self.capacity(method),
+                self.tokens[method] + elapsed * self.refill_rate(method),
+            )
+        self.last_refill[method] = now
+
+    async def acquire(self, method: str) -> None:
+        """
+        トークンを1つ消費します。バケットが空の場合は補充されるまで待機します。
+
+        Args:
+            method: Slack APIのメソッド名（例: "conversations.replies"）
+        """
+        while True:
+            self.refill(method)
+            if self.tokens[method] >= 1:
+                self.tokens[method] -= 1
+                return
+            await asyncio.sleep((1 - self.tokens[method]) / self.refill_rate(method))
+
+    def reset(self, method: str) -> None:
+        """
+        バケットを空にします。
+        レート制限に達した後、補充速度に合わせてリクエストを再開するために使用します。
+        """
+        self.tokens[method] = 0
+        self.last_refill[method] = time.monotonic()
+
+
+async def call_slack_api(
+    limiter: RateLimiter,
+    method: str,
+    api_method: Callable[..., Awaitable[AsyncSlackResponse]],
+    **kwargs: Any,
+) -> AsyncSlackResponse:
+    """
+    レートリミッターでトークンを取得してからSlack APIを呼び出します。
+    同時に実行される呼び出しはレートリミッターのセマフォで制限されます。
+    セマフォはAPI呼び出しの間だけ保持し、トークンの補充待ちや Retry-After の待機中は
+    解放しておくため、あるメソッドの待機が他のメソッドの呼び出しを妨げません。
+    レート制限に達した場合は Retry-After ヘッダーの秒数だけ待機してから再試行します。
 
+    Args:
+        limiter: レートリミッター
+        method: Slack APIのメソッド名（例: "conversations.replies"）
+        api_method: AsyncWebClientのAPIメソッド
+        **kwargs: APIメソッドに渡す引数
+
+    Returns:
+        AsyncSlackResponse: APIレスポンス
+    """
     while True:
+        await limiter.acquire(method)
         try:
-            response = client.conversations_history(
+            async with limiter.semaphore:
+                return await api_method(**kwargs)
+        except SlackApiError as e:
+            if e.response.get("error") != "ratelimited":
+                raise
+            retry_after = int(e.response.headers.get("Retry-After", 1))
+            logger.info(f"Rate limited. Waiting for {retry_after} seconds...")
+            await asyncio.sleep(retry_after)
+            limiter.reset(method)
+
+
+async def iter_messages_for_period(client: AsyncWebClient, limiter: RateLimiter, channel_id: str, oldest_ts: float, latest_ts: float) -> AsyncIterator[list[SlackRawMessage]]:
+    """
+    指定されたチャンネルから指定期間のメッセージをページ単位で取得します。
+    各ページは新しい順に並んでおり、ページ自体も新しいものから順に返されます。
+    次のページは呼び出し元が現在のページを処理している間に先読みします。
+    """
+    message_count = 0
+
+    # ページごとに変わらない値は事前に計算しておく
+    oldest = str(oldest_ts)
+    latest = str(latest_ts)
+    oldest_human = datetime.datetime.fromtimestamp(float(oldest_ts), JST)
+    latest_human = datetime.datetime.fromtimestamp(float(latest_ts), JST)
+
+    logger.info(f"Starting to fetch messages from channel '{channel_id}'...")
+    logger.info(f"Period: {oldest_human} to {latest_human} (JST)")
+
+    def request_page(cursor: str | None) -> asyncio.Task[AsyncSlackResponse]:
+        return asyncio.create_task(
+            call_slack_api(
+                limiter,
+                "conversations.history",
+                client.conversations_history,
                 channel=channel_id,
                 limit=200,
-                oldest=str(oldest_ts),
-                latest=str(latest_ts),
+                oldest=oldest,
+                latest=latest,
                 cursor=cursor,
             )
+        )
 
-            if response["ok"]:
-                messages = response["messages"]
-                all_messages.extend(messages)
-                message_count += len(messages)
-                logger.info(
-                    f"Retrieved {len(messages)} messages. Total: {message_count}"
-                )
+    next_page: asyncio.Task[AsyncSlackResponse] | None = request_page(None)
+    try:
+        while next_page is not None:
+            response = await next_page
 
-                if response.get("has_more"):
-                    cursor = response["response_metadata"]["next_cursor"]
-                    time.sleep(1)  # Rate limit avoidance
-                else:
-                    logger.info(
-                        "Successfully retrieved all messages for the specified period."
-                    )
-                    break
-            else:
+            if not response["ok"]:
                 logger.error(f"API Error: {response['error']}")
                 break
 
-        except SlackApiError as e:
-            logger.error(f"Slack API Error: {e.response['error']}")
-            if e.response.headers.get("Retry-After"):
-                retry_after = int(e.response.headers["Retry-After"])
-                logger.info(f"Rate limited. Waiting for {retry_after} seconds...")
-                time.sleep(retry_after)
+            # 呼び出し元が現在のページを処理している間に次のページを取得する
+            if response.get("has_more"):
+                next_page = request_page(response["response_metadata"]["next_cursor"])
             else:
-                break
-        except Exception as e:
-            logger.error(f"Unexpected error occurred: {e}")
-            break
+                next_page = None
 
-    return all_messages
+            messages = response["messages"]
+            message_count += len(messages)
+            logger.info(f"Retrieved {len(messages)} messages. Total: {message_count}")
+            yield messages
+
+            if next_page is None:
+                logger.info(
+                    "Successfully retrieved all messages for the specified period."
+                )
+    except SlackApiError as e:
+        logger.error(f"Slack API Error: {e.response['error']}")
+    except Exception as e:
+        logger.error(f"Unexpected error occurred: {e}")
+    finally:
+        # 途中で終了した場合は先読み中のリクエストを取り消す
+        if next_page is not None and not next_page.done():
+            next_page.cancel()
 
 
-def fetch_thread_messages(client: WebClient, channel_id: str, thread_ts: str) -> list[SlackRawMessage]:
+async def fetch_thread_messages(client: AsyncWebClient, limiter: RateLimiter, channel_id: str, thread_ts: str) -> list[SlackRawMessage]:
     """
     特定のスレッドからメッセージを取得します。
     """
     try:
-        response = client.conversations_replies(channel=channel_id, ts=thread_ts)
+        response = await call_slack_api(
+            limiter,
+            "conversations.replies",
+            client.conversations_replies,
+            channel=channel_id,
+            ts=thread_ts,
+        )
         if response["ok"]:
             return response["messages"][1:]
     except SlackApiError as e:
@@ -250,99 +433,355 @@ def fetch_thread_messages(client: WebClient, channel_id: str, thread_ts: str) ->
     return []
 
 
-def fetch_user_info(client: WebClient, user_ids: set[str]) -> dict[str, UserInfo]:
+async def fetch_all_thread_messages(client: AsyncWebClient, limiter: RateLimiter, channel_id: str, thread_ts_list: list[str]) -> dict[str, list[SlackRawMessage]]:
     """
-    ユーザーIDのリストからユーザー情報を取得します。
+    複数のスレッドのメッセージを並行して取得します。
+    同時リクエスト数はレートリミッターの上限までに制限されます。
 
     Args:
-        client: Slack WebClient
+        client: Slack AsyncWebClient
+        limiter: レートリミッター
+        channel_id: チャンネルID
+        thread_ts_list: スレッドの親メッセージのタイムスタンプ一覧
+
+    Returns:
+        dict[str, list[SlackRawMessage]]: スレッドのタイムスタンプと返信一覧のマッピング
+    """
+    results = await asyncio.gather(
+        *[
+            fetch_thread_messages(client, limiter, channel_id, thread_ts)
+            for thread_ts in thread_ts_list
+        ]
+    )
+    return dict(zip(thread_ts_list, results))
+
+
+def load_user_cache(path: Path) -> dict[str, tuple[UserInfo, float]]:
+    """
+    ユーザー情報キャッシュをファイルから読み込みます。
+    ファイルが存在しない、または読み込めない場合は空のキャッシュを返します。
+
+    Args:
+        path: キャッシュファイルのパス
+
+    Returns:
+        dict[str, tuple[UserInfo, float]]: ユーザーIDと（ユーザー情報, 取得時刻）のマッピング
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            raw_cache = json.load(f)
+        return {
+            user_id: (
+                UserInfo(name=entry["name"], display_name=entry["display_name"]),
+                float(entry["fetched_at"]),
+            )
+            for user_id, entry in raw_cache.items()
+        }
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        logger.warning(f"Ignoring unreadable user cache '{path}': {e}")
+        return {}
+
+
+def save_user_cache(path: Path, user_cache: dict[str, tuple[UserInfo, float]]) -> None:
+    """
+    ユーザー情報キャッシュをファイルに書き込みます。
+
+    Args:
+        path: キャッシュファイルのパス
+        user_cache: ユーザーIDと（ユーザー情報, 取得時刻）のマッピング
+    """
+    raw_cache = {
+        user_id: {**info.model_dump(), "fetched_at": fetched_at}
+        for user_id, (info, fetched_at) in user_cache.items()
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(raw_cache, f, ensure_ascii=False)
+    except OSError as e:
+        logger.error(f"Error occurred while writing user cache: {e}")
+
+
+def user_info_from_payload(user: dict[str, Any]) -> UserInfo:
+    """
+    Slack APIが返すユーザーオブジェクトからユーザー情報を作成します。
+    """
+    profile = user.get("profile", {})
+    user_name = user.get("name", "") or ""
+    # real_nameを優先し、存在しない場合にdisplay_nameを使用
+    display_name_val = profile.get("real_name") or profile.get("display_name") or ""
+    return UserInfo(name=user_name, display_name=display_name_val)
+
+
+async def prefetch_workspace_users(client: AsyncWebClient, limiter: RateLimiter) -> dict[str, UserInfo]:
+    """
+    users.list をページングしてワークスペースの全ユーザー情報を取得します。
+
+    Args:
+        client: Slack AsyncWebClient
+        limiter: レートリミッター
+
+    Returns:
+        dict[str, UserInfo]: ユーザーIDとユーザー情報のマッピング
+    """
+    workspace_users: dict[str, UserInfo] = {}
+    cursor = None
+    while True:
+        response = await call_slack_api(
+            limiter, "users.list", client.users_list, limit=1000, cursor=cursor
+        )
+        if not response["ok"]:
+            logger.error(f"API Error: {response['error']}")
+            break
+        for member in response["members"]:
+            workspace_users[member["id"]] = user_info_from_payload(member)
+        cursor = response.get("response_metadata", {}).get("next_cursor")
+        if not cursor:
+            break
+    logger.info(f"Retrieved {len(workspace_users)} users from users.list")
+    return workspace_users
+
+
+async def fetch_user_info(client: AsyncWebClient, limiter: RateLimiter, user_ids: set[str], user_cache: dict[str, tuple[UserInfo, float]] | None = None, users_list_threshold: int = USERS_LIST_THRESHOLD) -> dict[str, UserInfo]:
+    """
+    ユーザーIDのリストからユーザー情報を並行して取得します。
+    同時リクエスト数はレートリミッターの上限までに制限されます。
+    取得するユーザーが users_list_threshold 人を超える場合は users.list で一括取得し、
+    見つからなかったユーザーのみ users.info で個別に取得します。
+    users.list は Tier 2（約20ページ/分）でワークスペース全体を走査するため、
+    大規模なワークスペースでは users.info で個別に取得するより時間がかかることがあります。
+    その場合は users_list_threshold に 0 を指定すると users.list を使用しません。
+    キャッシュが指定された場合、有効期限内のユーザーはAPIを呼ばずにキャッシュから返し、
+    新たに取得したユーザー情報はキャッシュに追加します。
+
+    Args:
+        client: Slack AsyncWebClient
+        limiter: レートリミッター
         user_ids: ユーザーIDのセット
+        user_cache: ユーザー情報キャッシュ（オプション）
+        users_list_threshold: users.list を使用する人数のしきい値（0 の場合は使用しない）
 
     Returns:
         Dict[str, UserInfo]: ユーザーIDとユーザー情報のマッピング
     """
+    now = time.time()
     user_info: dict[str, UserInfo] = {}
-    for user_id in user_ids:
+    if user_cache is not None:
+        for user_id in user_ids:
+            cached = user_cache.get(user_id)
+            if cached and now - cached[1] < USER_CACHE_TTL_SECONDS:
+                user_info[user_id] = cached[0]
+
+    missing_ids = [user_id for user_id in user_ids if user_id not in user_info]
+    if users_list_threshold and len(missing_ids) > users_list_threshold:
         try:
-            response = client.users_info(user=user_id)
-            if response["ok"]:
-                user = response["user"]
-                profile = user.get("profile", {})
-                user_name = user.get("name", "") or ""
-                # real_nameを優先し、存在しない場合にdisplay_nameを使用
-                display_name_val = (
-                    profile.get("real_name") or profile.get("display_name") or ""
-                )
-                user_info[user_id] = UserInfo(
-                    name=user_name, display_name=display_name_val
-                )
-            time.sleep(1)  # Rate limit avoidance
+            workspace_users = await prefetch_workspace_users(client, limiter)
+        except SlackApiError as e:
+            logger.error(f"Error fetching users list: {e.response['error']}")
+            workspace_users = {}
+        for user_id in missing_ids:
+            if user_id in workspace_users:
+                user_info[user_id] = workspace_users[user_id]
+                if user_cache is not None:
+                    user_cache[user_id] = (workspace_users[user_id], now)
+
+    async def fetch(user_id: str) -> UserInfo | None:
+        try:
+            response = await call_slack_api(
+                limiter, "users.info", client.users_info, user=user_id
+            )
         except SlackApiError as e:
             logger.error(
                 f"Error fetching user info for {user_id}: {e.response['error']}"
             )
-            user_info[user_id] = UserInfo(name="", display_name="Unknown User")
+            return UserInfo(name="", display_name="Unknown User")
+        if not response["ok"]:
+            return None
+        info = user_info_from_payload(response["user"])
+        if user_cache is not None:
+            user_cache[user_id] = (info, now)
+        return info
+
+    id_list = [user_id for user_id in user_ids if user_id not in user_info]
+    results = await asyncio.gather(*[fetch(user_id) for user_id in id_list])
+    for user_id, info in zip(id_list, results):
+        if info is not None:
+            user_info[user_id] = info
     return user_info
 
 
-def save_messages_to_file(messages: list[SlackRawMessage], client: WebClient, channel_id: str, filename: str, start_date: str, end_date: str) -> None:
+@functools.lru_cache(maxsize=8192)
+def format_readable_second(sec: int) -> str:
+    """
+    Unix時刻（秒）を日本時間の "YYYY-MM-DD HH:MM:SS" 形式に変換します。
+    スレッドなどでは同じ秒のメッセージが続くことが多いため、結果をキャッシュします。
+    """
+    dt = datetime.datetime.fromtimestamp(sec, JST_FIXED_OFFSET)
+    return (
+        f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} "
+        f"{dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}"
+    )
+
+
+def format_readable_time(ts: str) -> str:
+    """
+    Slackのタイムスタンプを日本時間の "YYYY-MM-DD HH:MM:SS" 形式に変換します。
+    メッセージごとに呼ばれるため、strftimeを使わずに直接組み立てます。
+
+    Args:
+        ts: Slackのタイムスタンプ（例: "1700000000.123456"）
+
+    Returns:
+        str: 人間が読める形式の時刻（JST）
+    """
+    # 表示は秒単位のため、floatを経由せずに整数部分だけを取り出す
+    return format_readable_second(int(ts.split(".", 1)[0]))
+
+
+def dump_json_value(value: Any, level: int) -> bytes:
+    """
+    値をインデント幅2のJSON（UTF-8）に変換します。
+    ネストの深さ level に合わせて2行目以降を字下げします。
+    orjsonが利用可能な場合はorjsonを、そうでない場合は標準のjsonモジュールを使用します。
+    """
+    if orjson is not None:
+        data = orjson.dumps(value, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(value, ensure_ascii=False, indent=2).encode("utf-8")
+    return data.replace(b"\n", b"\n" + b"  " * level)
+
+
+def write_export_json(f: IO[bytes], start_date: str, end_date: str, users: dict[str, dict[str, str]], chat_entries: Iterable[SlackMessage]) -> None:
+    """
+    SlackExport形式のJSONをファイルに書き込みます。
+    chat配列は要素ごとにシリアライズして書き込むため、出力全体をメモリ上に保持しません。
+    出力は json.dump(..., indent=2) と同じ形式になります。
+
+    Args:
+        f: 書き込み先のファイル
+        start_date: エクスポート開始日時（JST）
+        end_date: エクスポート終了日時（JST）
+        users: ユーザーIDとユーザー情報のマッピング
+        chat_entries: 出力用のメッセージを古い順に返すイテラブル
+    """
+    f.write(b'{\n  "start_date": ' + dump_json_value(start_date, 1))
+    f.write(b',\n  "end_date": ' + dump_json_value(end_date, 1))
+    f.write(b',\n  "users": ' + dump_json_value(users, 1))
+    f.write(b',\n  "chat": [')
+    entry_count = 0
+    for entry in chat_entries:
+        f.write(b",\n    " if entry_count else b"\n    ")
+        f.write(dump_json_value(entry, 2))
+        entry_count += 1
+    f.write(b"\n  ]\n}" if entry_count else b"]\n}")
+
+
+def write_export_file(filename: str, start_date: str, end_date: str, users: dict[str, dict[str, str]], chat_entries: Iterable[SlackMessage]) -> None:
+    """
+    SlackExport形式のJSONファイルを作成します。
+
+    Args:
+        filename: 出力ファイル名
+        start_date: エクスポート開始日時（JST）
+        end_date: エクスポート終了日時（JST）
+        users: ユーザーIDとユーザー情報のマッピング
+        chat_entries: 出力用のメッセージを古い順に返すイテラブル
+    """
+    with open(filename, "wb", buffering=OUTPUT_BUFFER_SIZE) as f:
+        write_export_json(f, start_date, end_date, users, chat_entries)
+
+
+async def save_messages_to_file(pages: AsyncIterable[list[SlackRawMessage]], client: AsyncWebClient, limiter: RateLimiter, channel_id: str, filename: str, start_date: str, end_date: str, user_cache: dict[str, tuple[UserInfo, float]] | None = None, users_list_threshold: int = USERS_LIST_THRESHOLD) -> None:
     """
     取得したメッセージをスレッドメッセージを含めてJSON形式でファイルに保存します。
+    メッセージはページを受け取るたびに出力用のデータに変換し、スレッドの取得を開始するため、
+    履歴の取得とスレッドの取得・変換処理が並行して進みます。
+    メッセージが1件もない場合はファイルを作成しません。
     すべての時刻は日本時間（JST）で表示されます。
     """
     try:
-        # ユーザーIDを収集
+        # ページごとに古い順に1回だけ走査し、出力データ・ユーザーID・スレッドの親を集める
         user_ids = set()
-        for msg in messages:
-            user_ids.add(msg.get("user", "Unknown User"))
-            if msg.get("thread_ts") and msg.get("thread_ts") == msg.get("ts"):
-                thread_messages = fetch_thread_messages(client, channel_id, msg["ts"])
-                for reply in thread_messages:
-                    user_ids.add(reply.get("user", "Unknown User"))
-
-        # ユーザー情報を取得
-        user_info = fetch_user_info(client, user_ids)
-
-        # メッセージデータの準備
-        chat_data = []
-        for msg in reversed(messages):
-            thread_replies = []
-
-            if msg.get("thread_ts") and msg.get("thread_ts") == msg.get("ts"):
-                thread_messages = fetch_thread_messages(client, channel_id, msg["ts"])
-                for reply in thread_messages:
-                    dt_utc = datetime.datetime.fromtimestamp(
-                        float(reply.get("ts", "0")), pytz.UTC
+        chat_pages: list[list[SlackMessage]] = []
+        thread_fetches: list[
+            tuple[dict[str, SlackMessage], asyncio.Task[dict[str, list[SlackRawMessage]]]]
+        ] = []
+        async for page in pages:
+            page_data: list[SlackMessage] = []
+            thread_roots: dict[str, SlackMessage] = {}
+            for msg in reversed(page):
+                # 同じキーの参照を繰り返さないよう、ローカル変数に束縛して使い回す
+                ts = msg.get("ts", "")
+                thread_ts = msg.get("thread_ts")
+                user = msg.get("user", "Unknown User")
+                user_ids.add(user)
+                message_data: SlackMessage = {
+                    "timestamp": ts,
+                    "readable_time": format_readable_time(ts or "0"),
+                    "user": user,
+                    "text": msg.get("text", ""),
+                    "thread_replies": [],
+                }
+                # 返信のないスレッドの親は取得しない
+                if thread_ts and thread_ts == ts and msg.get("reply_count", 0) > 0:
+                    thread_roots[ts] = message_data
+                page_data.append(message_data)
+            chat_pages.append(page_data)
+
+            # 次のページを待つ間にこのページのスレッドを並行して取得する
+            if thread_roots:
+                thread_fetches.append(
+                    (
+                        thread_roots,
+                        asyncio.create_task(
+                            fetch_all_thread_messages(
+                                client, limiter, channel_id, list(thread_roots)
+                            )
+                        ),
                     )
-                    dt_jst = dt_utc.astimezone(JST)
-                    reply_data = ThreadReply(
-                        timestamp=reply.get("ts", ""),
-                        readable_time=dt_jst.strftime("%Y-%m-%d %H:%M:%S"),
-                        user=reply.get("user", "Unknown User"),
-                        text=reply.get("text", ""),
+                )
+
+        if not any(chat_pages):
+            logger.info("No messages found for the specified period.")
+            return
+
+        # スレッドの返信を親メッセージに追加する
+        for thread_roots, thread_fetch in thread_fetches:
+            thread_cache = await thread_fetch
+            for thread_ts, replies in thread_cache.items():
+                thread_replies = thread_roots[thread_ts]["thread_replies"]
+                for reply in replies:
+                    reply_ts = reply.get("ts", "")
+                    reply_user = reply.get("user", "Unknown User")
+                    user_ids.add(reply_user)
+                    thread_replies.append(
+                        {
+                            "timestamp": reply_ts,
+                            "readable_time": format_readable_time(reply_ts or "0"),
+                            "user": reply_user,
+                            "text": reply.get("text", ""),
+                        }
                     )
-                    thread_replies.append(reply_data)
 
-            dt_utc = datetime.datetime.fromtimestamp(
-                float(msg.get("ts", "0")), pytz.UTC
-            )
-            dt_jst = dt_utc.astimezone(JST)
-            message_data = SlackMessage(
-                timestamp=msg.get("ts", ""),
-                readable_time=dt_jst.strftime("%Y-%m-%d %H:%M:%S"),
-                user=msg.get("user", "Unknown User"),
-                text=msg.get("text", ""),
-                thread_replies=thread_replies,
-            )
-            chat_data.append(message_data)
+        # ページは新しい順に届くため、逆順につなげて古い順にする
+        chat_data = itertools.chain.from_iterable(reversed(chat_pages))
 
-        # Pydanticモデルを使用してデータを構造化
-        export_data = SlackExport(
-            start_date=start_date, end_date=end_date, users=user_info, chat=chat_data
+        # ユーザー情報を取得
+        user_info = await fetch_user_info(
+            client, limiter, user_ids, user_cache, users_list_threshold
         )
 
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(export_data.model_dump(), f, ensure_ascii=False, indent=2)
+        # ファイルへの書き込みはイベントループを止めないよう別スレッドで行う
+        await asyncio.to_thread(
+            write_export_file,
+            filename,
+            start_date,
+            end_date,
+            {user_id: info.model_dump() for user_id, info in user_info.items()},
+            chat_data,
+        )
 
         logger.info(f"Successfully saved messages to '{filename}' in JSON format")
     except OSError as e:
@@ -371,10 +810,10 @@ def generate_output_filename(
     return f"{channel_id}-{current_time}.json"
 
 
-if __name__ == "__main__":
-    # コマンドライン引数の解析
-    args = parse_args()
-
+async def main_async(args: argparse.Namespace) -> None:
+    """
+    コマンドライン引数に従ってメッセージを取得し、ファイルに保存します。
+    """
     token = SLACK_TOKEN
     channel_id_to_fetch = args.channel_id
     start_date = args.start_date
@@ -397,20 +836,32 @@ if __name__ == "__main__":
             logger.info(f"Start time (JST): {start_date_str}")
             logger.info(f"End time (JST): {end_date_str}")
 
-            client = WebClient(token=token)
-            all_messages = fetch_messages_for_period(
-                client, channel_id_to_fetch, oldest_timestamp, latest_timestamp
-            )
-
-            if all_messages:
-                output_filename = generate_output_filename(
-                    channel_id_to_fetch, args.output
-                )
-                save_messages_to_file(
-                    all_messages,
+            client = AsyncWebClient(token=token)
+            limiter = RateLimiter(max_concurrency=args.concurrency)
+            output_filename = generate_output_filename(channel_id_to_fetch, args.output)
+            user_cache = load_user_cache(USER_CACHE_PATH) if args.user_cache else None
+            await save_messages_to_file(
+                iter_messages_for_period(
                     client,
+                    limiter,
                     channel_id_to_fetch,
-                    output_filename,
-                    start_date_str,
-                    end_date_str,
-                )
+                    oldest_timestamp,
+                    latest_timestamp,
+                ),
+                client,
+                limiter,
+                channel_id_to_fetch,
+                output_filename,
+                start_date_str,
+                end_date_str,
+                user_cache,
+                args.users_list_threshold,
+            )
+            if user_cache is not None:
+                save_user_cache(USER_CACHE_PATH, user_cache)
+
+
+if __name__ == "__main__":
+    # コマンドライン引数の解析
+    args = parse_args()
+    asyncio.run(main_async(args))
@@ -1,10 +1,18 @@
 import sys
+import asyncio
 import datetime
 import pytest
-import pytz
+from zoneinfo import ZoneInfo
 import main
 
-JST = pytz.timezone("Asia/Tokyo")
+JST = ZoneInfo("Asia/Tokyo")
+
+async def as_pages(*pages):
+    for page in pages:
+        yield page
+
+async def collect_pages(pages):
+    return [page async for page in pages]
 
 def test_extract_channel_id_plain():
     assert main.extract_channel_id("C123ABC") == "C123ABC"
@@ -13,12 +21,21 @@ def test_extract_channel_id_url():
     url = "https://example.slack.com/archives/C456DEF"
     assert main.extract_channel_id(url) == "C456DEF"
 
+def test_extract_channel_id_unmatched_url():
+    url = "https://example.slack.com/client/T000/C456DEF"
+    assert main.extract_channel_id(url) == url
+
 def test_convert_datetime_to_timestamp():
     ts = main.convert_datetime_to_timestamp("2023-01-01", "12:34:56")
     dt = datetime.datetime.fromtimestamp(ts, JST)
     assert dt.year == 2023 and dt.month == 1 and dt.day == 1
     assert dt.hour == 12 and dt.minute == 34 and dt.second == 56
 
+def test_format_readable_time():
+    for ts in ["0", "1647824400.123456", "1700000000.999999", "1711897199.000100"]:
+        expected = datetime.datetime.fromtimestamp(float(ts), JST).strftime("%Y-%m-%d %H:%M:%S")
+        assert main.format_readable_time(ts) == expected
+
 def test_generate_output_filename_specified():
     assert main.generate_output_filename("C123ABC", "output.json") == "output.json"
 
@@ -26,7 +43,7 @@ def test_generate_output_filename_default(monkeypatch):
     class DummyDateTime(datetime.datetime):
         @classmethod
         def now(cls, tz=None):
-            return tz.localize(datetime.datetime(2023, 1, 2, 3, 4, 5))
+            return datetime.datetime(2023, 1, 2, 3, 4, 5, tzinfo=tz)
     monkeypatch.setattr(main.datetime, "datetime", DummyDateTime)
     filename = main.generate_output_filename("C123ABC", None)
     assert filename == "C123ABC-20230102-030405.json"
@@ -38,72 +55,141 @@ def test_parse_args(monkeypatch):
     assert args.channel_id == "C789GHI"
     assert args.start_date == "2023-02-03"
     assert args.end_date == "2023-02-04"
+    assert args.concurrency == main.MAX_CONCURRENT_REQUESTS
+    assert args.users_list_threshold == main.USERS_LIST_THRESHOLD
 
-def test_fetch_messages_for_period(monkeypatch):
+def test_parse_args_rejects_invalid_concurrency(monkeypatch):
+    test_args = ["main.py", "C789GHI", "2023-02-03", "--concurrency", "0"]
+    monkeypatch.setattr(sys, "argv", test_args)
+    with pytest.raises(SystemExit):
+        main.parse_args()
+
+def test_iter_messages_for_period(monkeypatch):
     class DummyClient:
         def __init__(self):
             self.calls = 0
-        def conversations_history(self, channel, limit, oldest, latest, cursor):
+        async def conversations_history(self, channel, limit, oldest, latest, cursor):
             self.calls += 1
             if self.calls == 1:
                 return {"ok": True, "messages": [{"ts": "1"}], "has_more": True, "response_metadata": {"next_cursor": "cursor1"}}
             return {"ok": True, "messages": [{"ts": "2"}], "has_more": False}
     client = DummyClient()
-    monkeypatch.setattr(main.time, "sleep", lambda x: None)
-    messages = main.fetch_messages_for_period(client, "C123", "0", "10")
-    assert [msg["ts"] for msg in messages] == ["1", "2"]
+    pages = asyncio.run(collect_pages(main.iter_messages_for_period(client, main.RateLimiter(), "C123", "0", "10")))
+    assert pages == [[{"ts": "1"}], [{"ts": "2"}]]
 
 def test_fetch_thread_messages(monkeypatch):
     from slack_sdk.errors import SlackApiError
     class DummyClient:
-        def conversations_replies(self, channel, ts):
+        async def conversations_replies(self, channel, ts):
             return {"ok": True, "messages": [{"ts": ts}, {"ts": "r1"}, {"ts": "r2"}]}
     client = DummyClient()
     # 正常系
-    replies = main.fetch_thread_messages(client, "C123", "100")
+    replies = asyncio.run(main.fetch_thread_messages(client, main.RateLimiter(), "C123", "100"))
     assert replies == [{"ts": "r1"}, {"ts": "r2"}]
     # エラー系: レスポンスを辞書として渡し、インデックスアクセス可能にする
     error_resp = {"error": "error", "headers": {}}
-    def error_replies(self, channel, ts):
+    async def error_replies(self, channel, ts):
         raise SlackApiError("err", error_resp)
     monkeypatch.setattr(DummyClient, "conversations_replies", error_replies)
-    replies = main.fetch_thread_messages(client, "C123", "100")
+    replies = asyncio.run(main.fetch_thread_messages(client, main.RateLimiter(), "C123", "100"))
     assert replies == []
 
 def test_fetch_user_info(monkeypatch):
     from slack_sdk.errors import SlackApiError
     class DummyClient:
-        def users_info(self, user):
+        async def users_info(self, user):
             if user == "U_err":
                 # エラー系: レスポンスを辞書として渡し、インデックスアクセス可能にする
                 resp = {"error": "e", "headers": {}}
                 raise SlackApiError("err", resp)
             return {"ok": True, "user": {"name": f"name_{user}", "profile": {"real_name": f"Real_{user}"}}}
     client = DummyClient()
-    result = main.fetch_user_info(client, {"U1", "U_err"})
+    result = asyncio.run(main.fetch_user_info(client, main.RateLimiter(), {"U1", "U_err"}))
     assert result["U1"].name == "name_U1"
     assert result["U1"].display_name == "Real_U1"
     assert result["U_err"].name == ""
     assert result["U_err"].display_name == "Unknown User"
 
+def test_fetch_user_info_uses_user_cache(monkeypatch):
+    class DummyClient:
+        def __init__(self):
+            self.requested = []
+        async def users_info(self, user):
+            self.requested.append(user)
+            return {"ok": True, "user": {"name": f"name_{user}", "profile": {"real_name": f"Real_{user}"}}}
+    monkeypatch.setattr(main.time, "time", lambda: 1_000_000.0)
+    fresh = 1_000_000.0 - 60
+    stale = 1_000_000.0 - main.USER_CACHE_TTL_SECONDS - 1
+    user_cache = {
+        "U_fresh": (main.UserInfo(name="cached", display_name="Cached"), fresh),
+        "U_stale": (main.UserInfo(name="old", display_name="Old"), stale),
+    }
+    client = DummyClient()
+    result = asyncio.run(main.fetch_user_info(client, main.RateLimiter(), {"U_fresh", "U_stale", "U_new"}, user_cache))
+    assert sorted(client.requested) == ["U_new", "U_stale"]
+    assert result["U_fresh"].name == "cached"
+    assert result["U_stale"].name == "name_U_stale"
+    assert user_cache["U_stale"] == (main.UserInfo(name="name_U_stale", display_name="Real_U_stale"), 1_000_000.0)
+    assert "U_new" in user_cache
+
+def test_fetch_user_info_uses_users_list_for_many_users(monkeypatch):
+    class DummyClient:
+        def __init__(self):
+            self.list_cursors = []
+            self.requested = []
+        async def users_list(self, limit, cursor):
+            self.list_cursors.append(cursor)
+            if cursor is None:
+                return {"ok": True, "members": [{"id": "U1", "name": "u1", "profile": {"real_name": "User One"}}], "response_metadata": {"next_cursor": "c1"}}
+            return {"ok": True, "members": [{"id": "U2", "name": "u2", "profile": {"display_name": "User Two"}}], "response_metadata": {"next_cursor": ""}}
+        async def users_info(self, user):
+            self.requested.append(user)
+            return {"ok": True, "user": {"name": f"name_{user}", "profile": {}}}
+    client = DummyClient()
+    result = asyncio.run(main.fetch_user_info(client, main.RateLimiter(), {"U1", "U2", "U_ext"}, users_list_threshold=2))
+    assert client.list_cursors == [None, "c1"]
+    # users.list に含まれないユーザーのみ個別に取得する
+    assert client.requested == ["U_ext"]
+    assert result["U1"].display_name == "User One"
+    assert result["U2"].display_name == "User Two"
+    assert result["U_ext"].name == "name_U_ext"
+    # しきい値が 0 の場合は users.list を使用しない
+    client = DummyClient()
+    asyncio.run(main.fetch_user_info(client, main.RateLimiter(), {"U1", "U2", "U_ext"}, users_list_threshold=0))
+    assert client.list_cursors == []
+    assert sorted(client.requested) == ["U1", "U2", "U_ext"]
+
+def test_user_cache_round_trip(tmp_path):
+    path = tmp_path / "cache" / "users.json"
+    assert main.load_user_cache(path) == {}
+    user_cache = {"U1": (main.UserInfo(name="u1", display_name="ユーザー1"), 123.0)}
+    main.save_user_cache(path, user_cache)
+    assert main.load_user_cache(path) == user_cache
+    path.write_text("not json", encoding="utf-8")
+    assert main.load_user_cache(path) == {}
+
 def test_save_messages_to_file(tmp_path, monkeypatch):
     import json
     messages = [
-        {"ts": "100", "user": "U1", "text": "hello", "thread_ts": "100"},
+        {"ts": "100", "user": "U1", "text": "hello", "thread_ts": "100", "reply_count": 1},
         {"ts": "200", "user": "U2", "text": "hi"}
     ]
     # スレッドメッセージとユーザー情報をスタブ
-    monkeypatch.setattr(main, "fetch_thread_messages", lambda client, ch, ts: [{"ts": "101", "user": "U3", "text": "reply"}] if ts=="100" else [])
+    async def dummy_fetch_thread_messages(client, limiter, ch, ts):
+        return [{"ts": "101", "user": "U3", "text": "reply"}] if ts=="100" else []
+    monkeypatch.setattr(main, "fetch_thread_messages", dummy_fetch_thread_messages)
     dummy_info = {
         "U1": main.UserInfo(name="u1", display_name="User One"),
         "U2": main.UserInfo(name="u2", display_name="User Two"),
         "U3": main.UserInfo(name="u3", display_name="User Three")
     }
-    monkeypatch.setattr(main, "fetch_user_info", lambda client, ids: dummy_info)
+    async def dummy_fetch_user_info(client, limiter, ids, user_cache=None, users_list_threshold=None):
+        return dummy_info
+    monkeypatch.setattr(main, "fetch_user_info", dummy_fetch_user_info)
     filename = tmp_path / "out.json"
     start_date = "2023-01-01 00:00:00"
     end_date = "2023-01-02 23:59:59"
-    main.save_messages_to_file(messages, None, "C123", str(filename), start_date, end_date)
+    asyncio.run(main.save_messages_to_file(as_pages(messages), None, main.RateLimiter(), "C123", str(filename), start_date, end_date))
     data = json.loads(filename.read_text(encoding="utf-8"))
     assert data["start_date"] == start_date
     assert data["end_date"] == end_date
@@ -115,4 +201,142 @@ def test_save_messages_to_file(tmp_path, monkeypatch):
     assert first["user"] == "U2"
     assert first["thread_replies"] == []
     assert second["user"] == "U1"
-    assert second["thread_replies"][0]["text"] == "reply" 
+    assert second["thread_replies"][0]["text"] == "reply"
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_write_export_json_matches_json_dump(monkeypatch, use_orjson):
+    import io
+    import json
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(main, "orjson", None)
+    users = {"U1": {"name": "u1", "display_name": "ユーザー1"}}
+    chat = [
+        {"timestamp": "1", "readable_time": "t", "user": "U1", "text": "改行\nあり", "thread_replies": []},
+        {"timestamp": "2", "readable_time": "t", "user": "U1", "text": "x", "thread_replies": [
+            {"timestamp": "3", "readable_time": "t", "user": "U1", "text": "reply"}
+        ]},
+    ]
+    for entries in (chat, []):
+        f = io.BytesIO()
+        main.write_export_json(f, "s", "e", users, iter(entries))
+        expected = json.dumps(
+            {"start_date": "s", "end_date": "e", "users": users, "chat": entries},
+            ensure_ascii=False,
+            indent=2,
+        )
+        assert f.getvalue().decode("utf-8") == expected
+
+def test_save_messages_to_file_fetches_each_thread_once(tmp_path, monkeypatch):
+    messages = [
+        {"ts": "100", "user": "U1", "text": "hello", "thread_ts": "100", "reply_count": 1},
+        {"ts": "200", "user": "U2", "text": "hi", "thread_ts": "200", "reply_count": 2},
+        # 返信がすべて削除されたスレッドの親は取得しない
+        {"ts": "300", "user": "U2", "text": "empty", "thread_ts": "300", "reply_count": 0},
+    ]
+    calls = []
+    async def dummy_fetch_thread_messages(client, limiter, ch, ts):
+        calls.append(ts)
+        return [{"ts": ts + ".1", "user": "U3", "text": "reply"}]
+    async def dummy_fetch_user_info(client, limiter, ids, user_cache=None, users_list_threshold=None):
+        return {}
+    monkeypatch.setattr(main, "fetch_thread_messages", dummy_fetch_thread_messages)
+    monkeypatch.setattr(main, "fetch_user_info", dummy_fetch_user_info)
+    filename = tmp_path / "out.json"
+    asyncio.run(main.save_messages_to_file(as_pages(messages), None, main.RateLimiter(), "C123", str(filename), "s", "e"))
+    assert sorted(calls) == ["100", "200"]
+
+def test_save_messages_to_file_orders_pages_oldest_first(tmp_path, monkeypatch):
+    import json
+    async def dummy_fetch_user_info(client, limiter, ids, user_cache=None, users_list_threshold=None):
+        return {}
+    monkeypatch.setattr(main, "fetch_user_info", dummy_fetch_user_info)
+    filename = tmp_path / "out.json"
+    # conversations.history はページ内・ページ間ともに新しい順に返す
+    pages = as_pages([{"ts": "4"}, {"ts": "3"}], [{"ts": "2"}, {"ts": "1"}])
+    asyncio.run(main.save_messages_to_file(pages, None, main.RateLimiter(), "C123", str(filename), "s", "e"))
+    data = json.loads(filename.read_text(encoding="utf-8"))
+    assert [msg["timestamp"] for msg in data["chat"]] == ["1", "2", "3", "4"]
+
+def test_save_messages_to_file_without_messages(tmp_path):
+    filename = tmp_path / "out.json"
+    asyncio.run(main.save_messages_to_file(as_pages([]), None, main.RateLimiter(), "C123", str(filename), "s", "e"))
+    assert not filename.exists()
+
+def test_call_slack_api_retries_when_rate_limited(monkeypatch):
+    from slack_sdk.errors import SlackApiError
+    class DummyResponse(dict):
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            self.headers = {"Retry-After": "3"}
+    calls = []
+    async def api_method(**kwargs):
+        calls.append(kwargs)
+        if len(calls) == 1:
+            raise SlackApiError("err", DummyResponse(error="ratelimited"))
+        return {"ok": True}
+    now = [0.0]
+    sleeps = []
+    async def dummy_sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+    monkeypatch.setattr(main.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(main.asyncio, "sleep", dummy_sleep)
+    limiter = main.RateLimiter({"users.info": 60})
+    response = asyncio.run(main.call_slack_api(limiter, "users.info", api_method, user="U1"))
+    assert response == {"ok": True}
+    assert calls == [{"user": "U1"}, {"user": "U1"}]
+    # Retry-After だけ待機した後、空になったバケットに1トークン補充されるまで待つ
+    assert sleeps == [3, 1.0]
+
+def test_call_slack_api_limits_concurrency():
+    limiter = main.RateLimiter(max_concurrency=2)
+    in_flight = 0
+    max_in_flight = 0
+    async def api_method(**kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        return {"ok": True}
+    async def call_many():
+        await asyncio.gather(*[main.call_slack_api(limiter, "users.info", api_method) for _ in range(5)])
+    asyncio.run(call_many())
+    assert max_in_flight == 2
+
+def test_call_slack_api_does_not_block_other_methods_while_bucket_is_empty():
+    limiter = main.RateLimiter({"conversations.replies": 1, "conversations.history": 50}, max_concurrency=1)
+    async def api_method(**kwargs):
+        return {"ok": True}
+    async def run():
+        # conversations.replies のトークンを使い切り、次の呼び出しを補充待ちにする
+        await main.call_slack_api(limiter, "conversations.replies", api_method)
+        waiting = asyncio.create_task(main.call_slack_api(limiter, "conversations.replies", api_method))
+        await asyncio.sleep(0)
+        try:
+            # 補充待ちの間もセマフォは空いており、別のメソッドは待たずに呼び出せる
+            return await asyncio.wait_for(
+                main.call_slack_api(limiter, "conversations.history", api_method), timeout=1
+            )
+        finally:
+            assert not waiting.done()
+            waiting.cancel()
+    assert asyncio.run(run()) == {"ok": True}
+
+def test_rate_limiter_waits_only_when_bucket_is_empty(monkeypatch):
+    now = [0.0]
+    sleeps = []
+    async def dummy_sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+    monkeypatch.setattr(main.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(main.asyncio, "sleep", dummy_sleep)
+    limiter = main.RateLimiter({"conversations.replies": 2})
+    async def acquire_three_times():
+        for _ in range(3):
+            await limiter.acquire("conversations.replies")
+    asyncio.run(acquire_three_times())
+    # 容量2のバケットは3回目のみ待機し、1トークンの補充（60秒/2）を待つ
+    assert sleeps == [30.0]